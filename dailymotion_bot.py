@@ -1,13 +1,29 @@
 import os
+import random
+import re
 import asyncio
+import contextlib
+import hashlib
 import logging
 import tempfile
+import threading
 import time
+import uuid
+from dataclasses import dataclass, replace
 from pyrogram import Client, filters
+from pyrogram.errors import FloodWait
+from pyrogram.handlers import MessageHandler
 from pyrogram.types import Message
 import aiohttp
+from aiohttp.helpers import content_disposition_header
 import aiofiles
-from urllib.parse import urlencode
+import aiofiles.os
+import orjson
+
+try:
+    import aiodns  # Lets aiohttp resolve names without a thread-pool hop
+except ImportError:
+    aiodns = None
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -25,11 +41,252 @@ app = Client(
     api_hash=API_HASH,
     bot_token=BOT_TOKEN,
     in_memory=True,  # Don't create session files
-    no_updates=False  # Enable updates
+    no_updates=False,  # Enable updates
+    max_concurrent_transmissions=4,  # Parallel file transfers across uploads
+    sleep_threshold=60  # Wait out short FloodWaits instead of raising
+)
+
+# "Key Name: value" lines of a credentials message; [ \t] keeps a match on its own line
+CRED_RE = re.compile(r'^[ \t]*([A-Za-z][A-Za-z _]*?)[ \t]*:[ \t]*(\S.*?)[ \t]*$', re.M)
+CRED_KEY_TRANSLATION = str.maketrans(' ', '_')
+REQUIRED_CREDENTIALS = frozenset({'api_key', 'api_secret', 'username', 'password'})
+
+# Streaming pipeline tuning: Pyrogram yields 1MB chunks, keep at most 8 in flight
+STREAM_CHUNK_SIZE = 1024 * 1024
+STREAM_QUEUE_SIZE = 8
+FILE_READ_SIZE = 4 * 1024 * 1024
+
+# Fallback downloads to disk are split across this many Telegram connections
+DOWNLOAD_CONCURRENCY = 4
+DOWNLOAD_MIN_SEGMENT = 16  # chunks; smaller files are not worth a second session
+
+# Parallel byte-range upload of files on disk; smaller files go in one request
+UPLOAD_CONCURRENCY = 4
+SINGLE_UPLOAD_THRESHOLD = 50 * 1024 * 1024
+PART_RETRIES = 3
+UPLOAD_RETRY_DELAY = 5  # seconds before the first whole-upload retry, doubling after
+
+# Progress message templates, formatted once per edit
+PROGRESS_BAR_LENGTH = 15
+PROGRESS_TEMPLATE = (
+    "🎬 **{operation}**\n"
+    "\n"
+    "{bar} {percentage:.1f}%\n"
+    "📦 {current_mb:.1f}MB / {total_mb:.1f}MB"
 )
+PROGRESS_SPEED_TEMPLATE = PROGRESS_TEMPLATE + (
+    "\n"
+    "🚀 {speed:.1f} MB/s\n"
+    "⏱️ ETA: {eta_min}m {eta_sec}s"
+)
+
+@dataclass(slots=True)
+class UserState:
+    """A user's conversation step and Dailymotion credentials"""
+    waiting_for: str | None = None
+    api_key: str | None = None
+    api_secret: str | None = None
+    username: str | None = None
+    password: str | None = None
+
+class CredentialStore:
+    """Per-user credentials and conversation state with TTL expiry
+
+    Entries are keyed by (event loop id, user id). No method awaits while
+    it reads or writes an entry, so each call is atomic on its event loop
+    and needs no lock. Abandoned entries expire after ``ttl``
+    seconds without access, and past ``maxsize`` entries the ones closest
+    to expiry are evicted first. Entries held with ``in_use()`` neither
+    expire nor get evicted. ``on_expire`` is called with the key of every
+    entry dropped that way. In production, use a database.
+    """
+
+    def __init__(self, ttl=3600, maxsize=10_000, on_expire=None):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.on_expire = on_expire
+        self._entries = {}  # key -> (expires_at, state)
+        self._pins = {}  # key -> number of in_use() holders
+        self._next_sweep = time.monotonic() + ttl
+
+    def _key(self, user_id):
+        return (id(asyncio.get_running_loop()), user_id)
+
+    def _load(self, key, now):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= now and key not in self._pins:
+            self._drop(key)
+            return None
+        return entry[1]
+
+    def _drop(self, key):
+        del self._entries[key]
+        if self.on_expire:
+            self.on_expire(key)
+
+    def _sweep(self, now):
+        """Drop expired and excess entries"""
+        self._next_sweep = now + self.ttl
+        unpinned = [key for key in self._entries if key not in self._pins]
+        for key in [key for key in unpinned if self._entries[key][0] <= now]:
+            self._drop(key)
+        if len(self._entries) > self.maxsize:
+            by_expiry = sorted((key for key in unpinned if key in self._entries),
+                               key=lambda key: self._entries[key][0])
+            for key in by_expiry[:len(self._entries) - self.maxsize]:
+                self._drop(key)
+
+    async def get(self, user_id):
+        """Return a copy of the user's state, blank if missing or expired"""
+        key = self._key(user_id)
+        now = time.monotonic()
+        state = self._load(key, now)
+        if state is None:
+            return UserState()
+        self._entries[key] = (now + self.ttl, state)
+        return replace(state)
+
+    async def set(self, user_id, state):
+        """Replace the user's state"""
+        key = self._key(user_id)
+        now = time.monotonic()
+        self._entries[key] = (now + self.ttl, replace(state))
+        if now >= self._next_sweep or len(self._entries) > self.maxsize:
+            self._sweep(now)
+
+    async def update(self, user_id, **fields):
+        """Merge fields into the user's state; a missing or expired state stays gone"""
+        key = self._key(user_id)
+        now = time.monotonic()
+        state = self._load(key, now)
+        if state is not None:
+            self._entries[key] = (now + self.ttl, replace(state, **fields))
+
+    @contextlib.asynccontextmanager
+    async def in_use(self, user_id):
+        """Keep the user's entry from expiring or being evicted while held
+
+        Uploads can run for longer than the TTL without touching the store,
+        so they hold the entry until they finish; its TTL restarts then.
+        """
+        key = self._key(user_id)
+        self._pins[key] = self._pins.get(key, 0) + 1
+        try:
+            yield
+        finally:
+            if self._pins[key] == 1:
+                del self._pins[key]
+            else:
+                self._pins[key] -= 1
+            entry = self._entries.get(key)
+            if entry:
+                self._entries[key] = (time.monotonic() + self.ttl, entry[1])
+
+# Global storage for user credentials and conversation state; a user's
+# upload actor goes away with their expired entry
+credential_store = CredentialStore(on_expire=lambda key: retire_uploader_actor(*key))
+
+# OAuth tokens per account: key -> (access_token, refresh_after, refresh_token), plus in-flight
+# requests; an account's entry is dropped when its last upload actor retires
+TOKEN_CACHE = {}
+TOKEN_INFLIGHT = {}
+TOKEN_REFRESH_MARGIN = 60
+
+# Per-request timeouts, built once; the session default only bounds connect and reads
+TOKEN_TIMEOUT = aiohttp.ClientTimeout(total=30)
+API_TIMEOUT = aiohttp.ClientTimeout(total=60)
+UPLOAD_TIMEOUT = aiohttp.ClientTimeout(total=3600)  # 1 hour per request
+
+# API calls are retried on 429/5xx and connection errors, backing off up to API_MAX_BACKOFF seconds
+API_RETRIES = 4
+API_MAX_BACKOFF = 30
+
+class UploadHTTPError(aiohttp.ClientError):
+    """The upload server answered a transfer with an error status"""
+
+    def __init__(self, status, message, retry_after=None):
+        super().__init__(f"HTTP {status}: {message}")
+        self.status = status
+        self.message = message
+        self.retry_after = retry_after
+
+    @property
+    def retryable(self):
+        """Rate limiting and server errors may pass; other 4xx answers will not"""
+        return self.status == 429 or self.status >= 500
+
+    @property
+    def size_exceeded(self):
+        """The file was rejected for its size"""
+        text = self.message.lower()
+        return self.status == 413 or (self.status == 400 and ('size' in text or 'length' in text))
+
+class SizedStreamPayload(aiohttp.AsyncIterablePayload):
+    """Async-iterable request body of known length
+
+    With the size set, the multipart writer can send a Content-Length
+    instead of falling back to chunked transfer encoding.
+    """
+
+    def __init__(self, value, size, **kwargs):
+        super().__init__(value, **kwargs)
+        self._size = size
+
+class FileRangePayload(aiohttp.Payload):
+    """Request body made of a byte range of an open file, sent with loop.sendfile()
+
+    On a plain TCP transport the kernel copies page cache straight into the
+    socket. TLS transports use asyncio's buffered sendfile fallback, and
+    loops without sendfile support (e.g. uvloop) read with os.pread().
+    """
+
+    def __init__(self, file, offset, length, **kwargs):
+        super().__init__(file, content_type='application/octet-stream', **kwargs)
+        self._offset = offset
+        self._size = length
+
+    async def write(self, writer):
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.sendfile(writer.transport, self._value, self._offset, self._size)
+        except NotImplementedError:
+            fd = self._value.fileno()
+            offset = self._offset
+            end = self._offset + self._size
+            while offset < end:
+                chunk = await loop.run_in_executor(None, os.pread, fd, min(STREAM_CHUNK_SIZE, end - offset), offset)
+                if not chunk:
+                    break
+                await writer.write(chunk)
+                offset += len(chunk)
+
+# One pooled HTTP session per event loop, shared by every user's uploader
+_http_sessions = {}
+
+def get_http_session():
+    """Return the running loop's pooled HTTP session, creating it on first use"""
+    loop_id = id(asyncio.get_running_loop())
+    session = _http_sessions.get(loop_id)
+    if session is None or session.closed:
+        connector = aiohttp.TCPConnector(
+            limit=100,
+            limit_per_host=20,
+            keepalive_timeout=75,
+            ttl_dns_cache=300,
+            enable_cleanup_closed=True,
+            resolver=aiohttp.AsyncResolver() if aiodns else None
+        )
+        timeout = aiohttp.ClientTimeout(total=None, sock_connect=10, sock_read=300)
+        session = _http_sessions[loop_id] = aiohttp.ClientSession(connector=connector, timeout=timeout)
+    return session
 
-# Global storage for user credentials (in production, use a database)
-user_credentials = {}
+async def close_http_session():
+    """Close the running loop's pooled HTTP session"""
+    session = _http_sessions.pop(id(asyncio.get_running_loop()), None)
+    if session and not session.closed:
+        await session.close()
 
 class DailymotionUploader:
     def __init__(self, api_key, api_secret, username, password):
@@ -37,210 +294,740 @@ class DailymotionUploader:
         self.api_secret = api_secret
         self.username = username
         self.password = password
+        self.token_key = self._account_key(api_key, api_secret, username, password)
         self.access_token = None
+        self.needs_credentials = False  # Dailymotion rejected the stored credentials
         self.base_url = "https://partner.api.dailymotion.com"  # Updated to Partner API
 
+    def matches(self, creds):
+        """Check whether this uploader was built from the given credentials
+
+        Stored credentials carry no password once it has been exchanged for
+        a refresh token, so a missing password matches on the account alone.
+        The uploader may have dropped its own password too, so a given one is
+        compared through the account key.
+        """
+        if creds.password is not None:
+            return self.token_key == self._account_key(creds.api_key, creds.api_secret, creds.username, creds.password)
+        return (self.api_key, self.api_secret, self.username) == (creds.api_key, creds.api_secret, creds.username)
+
     async def authenticate(self):
-        """Authenticate with Dailymotion Partner API"""
-        try:
-            auth_data = {
-                'grant_type': 'password',
+        """Authenticate with Dailymotion Partner API
+
+        Tokens are shared through TOKEN_CACHE until shortly before they
+        expire, and concurrent refreshes for the same account await a single
+        in-flight request. Once a refresh token is held the password is
+        dropped.
+        """
+        key = self.token_key
+        cached = TOKEN_CACHE.get(key)
+        if not cached or cached[1] <= time.monotonic():
+            inflight = TOKEN_INFLIGHT.get(key)
+            if inflight is None:
+                inflight = asyncio.ensure_future(self._request_token(key))
+                TOKEN_INFLIGHT[key] = inflight
+                inflight.add_done_callback(lambda _: TOKEN_INFLIGHT.pop(key, None))
+            if not await asyncio.shield(inflight):
+                return False
+            cached = TOKEN_CACHE[key]
+
+        self.access_token = cached[0]
+        self.needs_credentials = False
+        if cached[2]:
+            self.password = None  # The refresh token replaces it from here on
+        return True
+
+    def _invalidate_token(self, token):
+        """Mark a token the API rejected as expired, keeping its refresh token"""
+        key = self.token_key
+        cached = TOKEN_CACHE.get(key)
+        if cached and cached[0] == token:
+            TOKEN_CACHE[key] = (cached[0], 0, cached[2])
+
+    @staticmethod
+    def _account_key(api_key, api_secret, username, password):
+        """Cache key for this account that does not keep the secrets in plain text"""
+        material = '\0'.join((api_key, api_secret, username, password))
+        return hashlib.sha256(material.encode()).hexdigest()
+
+    async def _request_token(self, key):
+        """Request a new OAuth token and store it in TOKEN_CACHE
+
+        A cached refresh token is tried first; the password grant is the
+        fallback when there is none or it has been revoked.
+        """
+        cached = TOKEN_CACHE.get(key)
+        if cached and cached[2]:
+            token = await self._token_grant(key, {
+                'grant_type': 'refresh_token',
                 'client_id': self.api_key,
                 'client_secret': self.api_secret,
-                'username': self.username,
-                'password': self.password,
-                'scope': 'manage_videos'
-            }
-            timeout = aiohttp.ClientTimeout(total=30)
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.post(f"{self.base_url}/oauth/token", data=auth_data) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        self.access_token = data.get('access_token')
-                        logger.info("Successfully authenticated with Dailymotion")
-                        return True
-                    else:
-                        error_text = await response.text()
-                        logger.error(f"Authentication failed: {error_text}")
-                        return False
+                'refresh_token': cached[2]
+            })
+            if token:
+                return token
+        if self.password is None:
+            # _token_grant marked a rejected refresh token; other failures stay retryable
+            if not (cached and cached[2]):
+                self.needs_credentials = True  # Nothing left to authenticate with
+            if self.needs_credentials:
+                logger.error("Refresh token rejected and no password kept; credentials must be re-entered")
+            return None
+        return await self._token_grant(key, {
+            'grant_type': 'password',
+            'client_id': self.api_key,
+            'client_secret': self.api_secret,
+            'username': self.username,
+            'password': self.password,
+            'scope': 'manage_videos'
+        })
+
+    async def _token_grant(self, key, auth_data):
+        """POST one OAuth grant and cache the resulting token"""
+        try:
+            status, body = await self._api_request('POST', f"{self.base_url}/oauth/token",
+                                                   data=auth_data, timeout=TOKEN_TIMEOUT)
+            if status == 200:
+                data = orjson.loads(body)
+                token = data.get('access_token')
+                expires_in = data.get('expires_in', 3600)
+                TOKEN_CACHE[key] = (token, time.monotonic() + expires_in - TOKEN_REFRESH_MARGIN,
+                                    data.get('refresh_token'))
+                logger.info(f"Successfully authenticated with Dailymotion ({auth_data['grant_type']} grant)")
+                self.needs_credentials = False
+                return token
+            else:
+                logger.error(f"Authentication failed: {body.decode(errors='replace')}")
+                # 400 invalid_grant / 401 invalid_client: retrying cannot help
+                self.needs_credentials = status in (400, 401, 403)
+                return None
         except Exception as e:
             logger.error(f"Authentication error: {e}")
-            return False
-
-    async def upload_video(self, file_path, title, description="", progress_callback=None):
-        """Upload video to Dailymotion with error handling"""
-        max_retries = 3
-        retry_delay = 5
+            self.needs_credentials = False
+            return None
+
+    async def _api_request(self, method, url, idempotent=True, **kwargs):
+        """Send an API request and return (status, body)
+
+        429 and 5xx answers and connection errors are retried with jittered
+        exponential backoff, honouring Retry-After, so a flaky API call does
+        not cost the whole transfer. The last answer is returned as is.
+
+        A non-idempotent request may already have been processed when a 5xx
+        or a timeout comes back, so it is only retried on 429, on 503 with
+        Retry-After and when the connection was never made.
+        """
+        session = get_http_session()
+        for attempt in range(API_RETRIES):
+            try:
+                async with session.request(method, url, **kwargs) as response:
+                    body = await response.read()
+                    status = response.status
+                    retry_after = response.headers.get('Retry-After')
+                    if idempotent:
+                        retryable = status == 429 or status >= 500
+                    else:
+                        retryable = status == 429 or (status == 503 and retry_after is not None)
+                    if not retryable or attempt == API_RETRIES - 1:
+                        return status, body
+                    delay = self._backoff(attempt, retry_after)
+                    logger.warning(f"{method} {url} answered HTTP {status}, retrying in {delay:.1f}s")
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if attempt == API_RETRIES - 1 or not (idempotent or isinstance(e, aiohttp.ClientConnectorError)):
+                    raise
+                delay = self._backoff(attempt)
+                logger.warning(f"{method} {url} failed ({e!r}), retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+    @staticmethod
+    def _backoff(attempt, retry_after=None, base=None):
+        """Seconds to wait before retry number ``attempt + 1``
+
+        Without a base this is full jitter up to 2**attempt seconds; with one
+        it is base * 2**attempt stretched by up to half, so it never drops
+        below the base.
+        """
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), API_MAX_BACKOFF)
+        if base:
+            return min(API_MAX_BACKOFF, base * 2 ** attempt * (1 + random.random() * 0.5))
+        return random.uniform(0, min(API_MAX_BACKOFF, 2 ** attempt))
+
+    async def upload_video(self, source, title, description="", progress_callback=None,
+                           file_size=None, filename=None, upload_url=None):
+        """Upload video to Dailymotion with error handling
+
+        ``source`` is either a file path or an async iterator of byte chunks.
+        A chunk stream can only be consumed once, so it gets a single attempt
+        and the caller is expected to fall back to a temp file when it
+        returns None. Failures a retry cannot fix return one of UPLOAD_ERRORS
+        instead. A prefetched ``upload_url`` is used for the first attempt only.
+        """
+        from_file = isinstance(source, str)
+        max_retries = 3 if from_file else 1
+        retry_after = None
+
+        if from_file:
+            file_size = await aiofiles.os.path.getsize(source)
+            filename = filename or os.path.basename(source)
 
         for attempt in range(max_retries):
+            if attempt:
+                delay = self._backoff(attempt - 1, retry_after, base=UPLOAD_RETRY_DELAY)
+                logger.info(f"Retrying upload in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                retry_after = None
             try:
                 logger.info(f"Upload attempt {attempt + 1}/{max_retries}")
 
-                if not self.access_token:
-                    if not await self.authenticate():
-                        continue
+                if not await self.authenticate():
+                    if self.needs_credentials:
+                        return "AUTH_ERROR"  # Rejected credentials will not pass on a retry
+                    continue
 
                 # Step 1: Get upload URL
-                upload_url = await self._get_upload_url()
+                if attempt or not upload_url:
+                    upload_url = await self._get_upload_url()
                 if not upload_url:
                     continue
 
                 # Step 2: Upload file
-                video_url = await self._upload_file(file_path, upload_url, progress_callback)
+                if from_file and file_size >= SINGLE_UPLOAD_THRESHOLD:
+                    video_url = await self._upload_parts(upload_url, source, filename, file_size, progress_callback)
+                elif file_size and file_size >= SINGLE_UPLOAD_THRESHOLD:
+                    video_url = await self._upload_stream_parts(upload_url, source, filename, file_size, progress_callback)
+                else:
+                    chunks = self._read_file(source) if from_file else source
+                    video_url = await self._upload_file(upload_url, chunks, filename, file_size, progress_callback)
                 if not video_url:
                     continue
 
-                # Step 3: Create video entry
+                # Step 3: Create video entry; a failure may still have created it,
+                # so neither the upload nor the fallback runs again
                 video_id = await self._create_video(video_url, title, description)
-                if video_id:
-                    return video_id
+                return video_id or "CREATE_ERROR"
 
-            except aiohttp.ClientError as e:
-                logger.error(f"Network error on attempt {attempt + 1}: {e}")
-                if attempt < max_retries - 1:
-                    await asyncio.sleep(retry_delay)
-                    continue
-            except Exception as e:
-                logger.error(f"Upload error on attempt {attempt + 1}: {e}")
-                if "length" in str(e).lower() or "size" in str(e).lower():
+            except UploadHTTPError as e:
+                logger.error(f"Upload rejected on attempt {attempt + 1}: {e}")
+                if e.size_exceeded:
                     logger.error("File size limit exceeded")
                     return "SIZE_ERROR"
-                if attempt < max_retries - 1:
-                    await asyncio.sleep(retry_delay)
-                    continue
+                if not e.retryable:
+                    return "REJECTED"
+                retry_after = e.retry_after
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.error(f"Network error on attempt {attempt + 1}: {e!r}")
+            except Exception as e:
+                logger.error(f"Upload error on attempt {attempt + 1}: {e}")
 
         return None
 
+    async def prepare_upload(self):
+        """Authenticate and fetch an upload URL ahead of the upload"""
+        if not await self.authenticate():
+            return None
+        return await self._get_upload_url()
+
     async def _get_upload_url(self):
         """Get upload URL from Dailymotion"""
         try:
-            headers = {'Authorization': f'Bearer {self.access_token}'}
-            timeout = aiohttp.ClientTimeout(total=30)
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.get(f"{self.base_url}/file/upload", headers=headers) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return data.get('upload_url')
-                    else:
-                        logger.error(f"Get upload URL failed: {await response.text()}")
+            status, body = await self._authorized_request('GET', '/file/upload')
+            if status == 200:
+                return orjson.loads(body).get('upload_url')
+            logger.error(f"Get upload URL failed: {body.decode(errors='replace')}")
         except Exception as e:
             logger.error(f"Get upload URL error: {e}")
         return None
 
-    async def _upload_file(self, file_path, upload_url, progress_callback=None):
-        """Upload file with chunked upload for large files"""
+    async def _upload_file(self, upload_url, chunks, filename, file_size, progress_callback=None):
+        """Stream the file body to the upload URL as multipart form data"""
         try:
-            file_size = os.path.getsize(file_path)
             logger.info(f"Uploading file: {file_size} bytes")
 
-            timeout = aiohttp.ClientTimeout(total=3600)  # 1 hour timeout
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                with open(file_path, 'rb') as file:
-                    form_data = aiohttp.FormData()
-                    form_data.add_field('file', file, filename=os.path.basename(file_path))
-                    
-                    # Pass total size for progress tracking
-                    if progress_callback:
-                        total_size = file_size
-                        current = 0
-                        async with session.post(upload_url, data=form_data) as response:
-                            if response.status == 200:
-                                async for chunk in response.content.iter_chunked(1024 * 1024):  # 1MB chunks
-                                    current += len(chunk)
-                                    await progress_callback(current, total_size)
-                                result = await response.json()
-                                return result.get('url')
-                            else:
-                                error_text = await response.text()
-                                logger.error(f"File upload failed: {error_text}")
+            form_data = aiohttp.MultipartWriter('form-data')
+            body = SizedStreamPayload(self._track_progress(chunks, file_size, progress_callback), file_size)
+            part = form_data.append_payload(body)
+            part.set_content_disposition('form-data', name='file', filename=filename)
+
+            session = get_http_session()
+            async with session.post(upload_url, data=form_data, timeout=UPLOAD_TIMEOUT) as response:
+                if response.status == 200:
+                    result = orjson.loads(await response.read())
+                    return result.get('url')
+                error_text = await response.text()
+                logger.error(f"File upload failed: {error_text}")
+                raise UploadHTTPError(response.status, error_text, response.headers.get('Retry-After'))
         except Exception as e:
             logger.error(f"File upload error: {e}")
             raise
-        return None
+
+    async def _upload_parts(self, upload_url, file_path, filename, file_size, progress_callback=None):
+        """Upload the file as byte ranges over parallel connections
+
+        Uses the upload server's resumable protocol: every part carries the
+        same Session-ID and its Content-Range, intermediate parts are answered
+        with 201 and the part completing the file gets the final 200 + JSON.
+        """
+        part_size = self._part_size(file_size)
+        parts = [(offset, min(part_size, file_size - offset)) for offset in range(0, file_size, part_size)]
+        logger.info(f"Uploading file: {file_size} bytes in {len(parts)} parts")
+
+        session_id = uuid.uuid4().hex
+        semaphore = asyncio.Semaphore(UPLOAD_CONCURRENCY)
+        result = {}
+        sent = 0
+
+        async def upload_part(offset, length):
+            nonlocal sent
+            async with semaphore:
+                # Each part gets its own handle: the sendfile fallback seeks it
+                file = await asyncio.to_thread(open, file_path, 'rb')
+                try:
+                    data = FileRangePayload(file, offset, length)
+                    result.update(await self._send_part(upload_url, session_id, filename, data, offset, length, file_size))
+                finally:
+                    file.close()
+            sent += length
+            if progress_callback:
+                progress_callback(sent, file_size)
+
+        tasks = [asyncio.create_task(upload_part(*part)) for part in parts]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+
+        return result.get('url')
+
+    async def _upload_stream_parts(self, upload_url, chunks, filename, file_size, progress_callback=None):
+        """Upload a one-shot chunk stream as sequential byte-range parts
+
+        Exactly one part is buffered while the previous one is in flight, so
+        memory stays at two parts whatever the file size, and a failed part
+        can be resent from its buffer instead of restarting the stream.
+        """
+        part_size = self._part_size(file_size)
+        logger.info(f"Streaming file: {file_size} bytes in {part_size} byte parts")
+
+        session_id = uuid.uuid4().hex
+        result = {}
+        pending = None
+        buffered = []
+        buffered_size = 0
+        offset = 0
+
+        async def flush():
+            nonlocal pending, buffered, buffered_size, offset
+            data = b''.join(buffered)
+            part_offset = offset
+            offset += buffered_size
+            buffered, buffered_size = [], 0
+            if pending:
+                result.update(await pending)  # Previous part acknowledged
+                if progress_callback:
+                    progress_callback(part_offset, file_size)
+            pending = asyncio.create_task(
+                self._send_part(upload_url, session_id, filename, data, part_offset, len(data), file_size)
+            )
+
+        try:
+            async for chunk in chunks:
+                buffered.append(chunk)
+                buffered_size += len(chunk)
+                if buffered_size >= part_size:
+                    await flush()
+            if buffered:
+                await flush()
+            if pending:
+                result.update(await pending)
+                if progress_callback:
+                    progress_callback(offset, file_size)
+        finally:
+            if pending and not pending.done():
+                pending.cancel()
+
+        return result.get('url')
+
+    async def _send_part(self, upload_url, session_id, filename, data, offset, length, file_size):
+        """POST one byte range, retrying it on network errors
+
+        Returns the upload result for the part that completed the file and
+        an empty dict for intermediate parts.
+        """
+        headers = {
+            'Session-ID': session_id,
+            'Content-Range': f'bytes {offset}-{offset + length - 1}/{file_size}',
+            # Quotes and escapes the user-supplied Telegram file name
+            'Content-Disposition': content_disposition_header('attachment', filename=filename)
+        }
+        session = get_http_session()
+
+        for attempt in range(PART_RETRIES):
+            try:
+                async with session.post(upload_url, data=data, headers=headers, timeout=UPLOAD_TIMEOUT) as response:
+                    if response.status == 200:
+                        return orjson.loads(await response.read())
+                    if response.status == 201:
+                        return {}
+                    error_text = await response.text()
+                    logger.error(f"Part at {offset} upload failed: {error_text}")
+                    raise UploadHTTPError(response.status, error_text, response.headers.get('Retry-After'))
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if attempt == PART_RETRIES - 1 or (isinstance(e, UploadHTTPError) and not e.retryable):
+                    raise
+                await asyncio.sleep(self._backoff(attempt, getattr(e, 'retry_after', None)))
+
+    @staticmethod
+    def _part_size(file_size):
+        """Pick a part size that keeps the part count reasonable"""
+        if file_size < 100 * 1024 * 1024:
+            return 5 * 1024 * 1024
+        if file_size < 1024 * 1024 * 1024:
+            return 16 * 1024 * 1024
+        return 64 * 1024 * 1024
+
+    @staticmethod
+    async def _read_file(file_path, chunk_size=FILE_READ_SIZE):
+        """Yield the file in chunks without blocking the event loop"""
+        async with aiofiles.open(file_path, 'rb') as file:
+            while chunk := await file.read(chunk_size):
+                yield chunk
+
+    @staticmethod
+    async def _track_progress(chunks, total_size, progress_callback):
+        """Pass chunks through, reporting bytes sent so far"""
+        current = 0
+        async for chunk in chunks:
+            yield chunk
+            current += len(chunk)
+            if progress_callback:
+                progress_callback(current, total_size)
 
     async def _create_video(self, video_url, title, description):
         """Create video entry on Dailymotion"""
         try:
-            headers = {
-                'Authorization': f'Bearer {self.access_token}',
-                'Content-Type': 'application/x-www-form-urlencoded'
-            }
             video_data = {
                 'url': video_url,
                 'title': title,
                 'description': description,
                 'published': 'true'
             }
-            timeout = aiohttp.ClientTimeout(total=60)
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.post(f"{self.base_url}/me/videos",
-                                      headers=headers,
-                                      data=video_data) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return data.get('id')
-                    else:
-                        logger.error(f"Create video failed: {await response.text()}")
+            # aiohttp form-encodes the dict and sets the Content-Type itself
+            # Replaying a processed create would publish the video twice
+            status, body = await self._authorized_request('POST', '/me/videos', idempotent=False,
+                                                          data=video_data)
+            if status == 200:
+                return orjson.loads(body).get('id')
+            logger.error(f"Create video failed: {body.decode(errors='replace')}")
         except Exception as e:
             logger.error(f"Create video error: {e}")
         return None
 
+    async def video_exists(self, video_id):
+        """Check that a video uploaded earlier is still on Dailymotion
+
+        Only a 404/410 or a deleted/rejected status counts as gone, so an
+        unreachable API does not turn into a duplicate upload.
+        """
+        try:
+            status, body = await self._authorized_request('GET', f'/video/{video_id}',
+                                                          params={'fields': 'id,status'})
+            if status in (404, 410):
+                return False
+            if status == 200:
+                return orjson.loads(body).get('status') not in ('deleted', 'rejected')
+            logger.warning(f"Video {video_id} check answered HTTP {status}")
+        except Exception as e:
+            logger.warning(f"Video {video_id} check error: {e}")
+        return True
+
+    async def _authorized_request(self, method, path, idempotent=True, **kwargs):
+        """Send an API request with the access token and return (status, body)
+
+        The token is checked before every request, since an upload can
+        outlive it, and a 401 answer drops it and retries once with a fresh
+        one. Returns (401, b'') when no token can be obtained.
+        """
+        for retry in (True, False):
+            if not await self.authenticate():
+                return 401, b''
+            headers = {'Authorization': f'Bearer {self.access_token}'}
+            status, body = await self._api_request(method, f"{self.base_url}{path}", idempotent=idempotent,
+                                                   headers=headers, timeout=API_TIMEOUT, **kwargs)
+            if status != 401 or not retry:
+                return status, body
+            logger.warning("Access token rejected, refreshing")
+            self._invalidate_token(self.access_token)
+
     def get_video_url(self, video_id):
         """Get public URL of uploaded video"""
         return f"https://www.dailymotion.com/video/{video_id}"
 
+@dataclass
+class UploadJob:
+    message: Message
+    progress_msg: Message
+    title: str
+    description: str
+    result: asyncio.Future
+
+# Videos transferred at once across all users; the rest wait their turn
+MAX_CONCURRENT_UPLOADS = int(os.getenv('MAX_CONCURRENT_UPLOADS', '4'))
+upload_slots = asyncio.Semaphore(MAX_CONCURRENT_UPLOADS)
+
+# Finished uploads: (account token key, Telegram file_unique_id) -> video id, oldest evicted first
+UPLOADED_VIDEOS = {}
+UPLOADED_VIDEOS_MAX = 1000
+
+# upload_video() results for failures that a retry or the temp-file fallback cannot fix
+UPLOAD_ERRORS = frozenset({"SIZE_ERROR", "AUTH_ERROR", "REJECTED", "CREATE_ERROR"})
+
+class UploaderActor:
+    """Owns one DailymotionUploader and runs its upload jobs one at a time
+
+    Handlers submit jobs and await their result future instead of sharing
+    the uploader, so an account's token and rate limit are only
+    ever used by this task.
+    """
+
+    def __init__(self, uploader):
+        self.uploader = uploader
+        self.jobs = asyncio.Queue()
+        self._loop = asyncio.get_running_loop()
+        self._task = asyncio.create_task(self._run())
+
+    async def submit(self, message, progress_msg, title, description):
+        """Queue an upload and wait for its video id, None or an UPLOAD_ERRORS value"""
+        if self._task.done():
+            raise RuntimeError("Upload actor has been retired")
+        job = UploadJob(message, progress_msg, title, description, self._loop.create_future())
+        await self.jobs.put(job)
+        return await job.result
+
+    def retire(self):
+        """Stop the actor once its running and queued jobs are done"""
+        self._loop.call_soon_threadsafe(self.jobs.put_nowait, None)
+
+    async def _run(self):
+        while True:
+            job = await self.jobs.get()
+            if job is None:
+                if self.jobs.empty():
+                    forget_account_token(self.uploader.token_key)
+                    return  # Retired and drained
+                self.jobs.put_nowait(None)  # Jobs submitted after retire() still run
+                continue
+            if job.result.done():
+                continue  # Submitter went away
+            try:
+                result = await self._process(job)
+            except asyncio.CancelledError:
+                job.result.cancel()
+                raise
+            except Exception as e:
+                if not job.result.done():
+                    job.result.set_exception(e)
+            else:
+                if not job.result.done():
+                    job.result.set_result(result)
+
+    async def _process(self, job):
+        key = (self.uploader.token_key, job.message.video.file_unique_id)
+        video_id = UPLOADED_VIDEOS.get(key)
+        if video_id:
+            if await self.uploader.video_exists(video_id):
+                logger.info(f"Video {job.message.video.file_unique_id} already uploaded as {video_id}")
+                return video_id
+            logger.info(f"Video {video_id} is gone from Dailymotion, uploading again")
+            UPLOADED_VIDEOS.pop(key, None)
+
+        if upload_slots.locked():
+            try:
+                await job.progress_msg.edit_text("⏳ **Waiting for a free upload slot...**")
+            except FloodWait as e:
+                logger.warning(f"Slot wait notice flood-limited for {e.value}s")
+            except Exception:
+                pass  # A status edit must not fail the upload
+        async with upload_slots:
+            result = await stream_video(job.message, self.uploader, job.progress_msg, job.title, job.description)
+            if result is None:  # Transient failure; UPLOAD_ERRORS would fail again
+                logger.warning("Streaming upload failed, falling back to temp file")
+                result = await upload_via_temp_file(job.message, self.uploader, job.progress_msg, job.title, job.description)
+
+        if result and result not in UPLOAD_ERRORS:
+            if len(UPLOADED_VIDEOS) >= UPLOADED_VIDEOS_MAX:
+                del UPLOADED_VIDEOS[next(iter(UPLOADED_VIDEOS))]
+            UPLOADED_VIDEOS[key] = result
+        return result
+
+    async def close(self):
+        """Stop the actor task and cancel its queued jobs"""
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        while not self.jobs.empty():
+            job = self.jobs.get_nowait()
+            if job:
+                job.result.cancel()
+
+# Upload actors cached per user and event loop
+_actor_cache = {}
+_actor_cache_lock = threading.Lock()
+
+def get_uploader_actor(user_id, creds):
+    """Return the user's upload actor on the running loop, rebuilding it if credentials changed
+
+    Returns None when the actor has to be rebuilt but the stored credentials
+    no longer hold a password to build it from.
+    """
+    with _actor_cache_lock:
+        actor = _actor_cache.get((user_id, id(asyncio.get_running_loop())))
+    if actor and actor.uploader.matches(creds) and not actor.uploader.needs_credentials:
+        return actor
+    if creds.password is None:
+        return None  # The password is gone; the user has to send credentials again
+    return install_uploader_actor(user_id, DailymotionUploader(
+        creds.api_key,
+        creds.api_secret,
+        creds.username,
+        creds.password
+    ))
+
+def install_uploader_actor(user_id, uploader):
+    """Make ``uploader`` the user's upload actor on the running loop
+
+    An actor already running for the same account is kept. One for other
+    credentials is retired, so it finishes its current and queued uploads
+    before it stops.
+    """
+    key = (user_id, id(asyncio.get_running_loop()))
+    with _actor_cache_lock:
+        stale = _actor_cache.get(key)
+        if stale and stale.uploader.token_key == uploader.token_key and not stale.uploader.needs_credentials:
+            return stale
+        actor = _actor_cache[key] = UploaderActor(uploader)
+    if stale:
+        stale.retire()
+    return actor
+
+def forget_account_token(token_key):
+    """Drop an account's cached tokens once no upload actor uses them"""
+    with _actor_cache_lock:
+        if any(actor.uploader.token_key == token_key for actor in _actor_cache.values()):
+            return
+    TOKEN_CACHE.pop(token_key, None)
+
+def retire_uploader_actor(loop_id, user_id):
+    """Retire the user's upload actor on the given loop, if there is one"""
+    with _actor_cache_lock:
+        actor = _actor_cache.pop((user_id, loop_id), None)
+    if actor:
+        actor.retire()
+
+async def close_uploader_actors():
+    """Close every cached upload actor that belongs to the running loop"""
+    loop_id = id(asyncio.get_running_loop())
+    with _actor_cache_lock:
+        keys = [key for key in _actor_cache if key[1] == loop_id]
+        actors = [_actor_cache.pop(key) for key in keys]
+    for actor in actors:
+        await actor.close()
+
 class ProgressTracker:
+    _BARS = tuple(
+        "█" * i + "░" * (PROGRESS_BAR_LENGTH - i) for i in range(PROGRESS_BAR_LENGTH + 1)
+    )
+
     def __init__(self, message, total_size, operation="Processing"):
         self.message = message
         self.total_size = total_size
         self.operation = operation
         self.last_update = 0
-        self.start_time = time.time()
+        self.last_percentage = None
+        self.last_text = None
+        self.start_time = time.monotonic()
+        # Callbacks only stamp the latest snapshot; one flusher task does the edits
+        self.current = None
+        self.total = None
+        self._changed = asyncio.Event()
+        self._flusher = asyncio.create_task(self._flush())
+
+    def record(self, current, total=None):
+        """Progress callback: remember the latest value without editing"""
+        self.current = current
+        self.total = total
+        self._changed.set()
+
+    async def _flush(self):
+        while True:
+            await asyncio.sleep(1)
+            await self._changed.wait()  # A stalled transfer costs no wakeups
+            self._changed.clear()
+            await self.update(self.current, self.total)
+
+    async def close(self):
+        """Stop the flusher task"""
+        self._flusher.cancel()
+        try:
+            await self._flusher
+        except asyncio.CancelledError:
+            pass
 
     async def update(self, current, total=None):
         if total is None:
             total = self.total_size
 
-        current_time = time.time()
-        if current_time - self.last_update < 3:  # Update every 3 seconds
+        current_time = time.monotonic()
+        if current_time - self.last_update < 1:  # At most one edit per second
             return
 
-        self.last_update = current_time
         percentage = (current / total) * 100 if total > 0 else 0
+        if self.last_percentage is not None and percentage - self.last_percentage < 1:
+            return  # Skip edits that would barely change the message
 
-        # Progress bar
-        bar_length = 15
-        filled_length = int(bar_length * current / total) if total > 0 else 0
-        bar = "█" * filled_length + "░" * (bar_length - filled_length)
+        self.last_update = current_time
+        self.last_percentage = percentage
+
+        filled_length = int(PROGRESS_BAR_LENGTH * current / total) if total > 0 else 0
+        fields = dict(
+            operation=self.operation,
+            bar=self._BARS[min(filled_length, PROGRESS_BAR_LENGTH)],
+            percentage=percentage,
+            current_mb=current / (1024 * 1024),
+            total_mb=total / (1024 * 1024),
+        )
 
         # Speed and ETA
         elapsed_time = current_time - self.start_time
         if elapsed_time > 0 and current > 0:
-            speed = current / elapsed_time / (1024 * 1024)  # MB/s
-            eta = (total - current) / (current / elapsed_time) if current > 0 else 0
-            progress_text = f"""
-🎬 **{self.operation}**
-
-{bar} {percentage:.1f}%
-📦 {current/(1024*1024):.1f}MB / {total/(1024*1024):.1f}MB
-🚀 {speed:.1f} MB/s
-⏱️ ETA: {int(eta//60)}m {int(eta%60)}s
-            """
+            eta = int((total - current) / (current / elapsed_time))
+            progress_text = PROGRESS_SPEED_TEMPLATE.format(
+                speed=current / elapsed_time / (1024 * 1024),  # MB/s
+                eta_min=eta // 60,
+                eta_sec=eta % 60,
+                **fields,
+            )
         else:
-            progress_text = f"""
-🎬 **{self.operation}**
+            progress_text = PROGRESS_TEMPLATE.format(**fields)
 
-{bar} {percentage:.1f}%
-📦 {current/(1024*1024):.1f}MB / {total/(1024*1024):.1f}MB
-            """
+        if progress_text == self.last_text:
+            return  # Telegram rejects no-op edits after a full round-trip
+        self.last_text = progress_text
 
         try:
-            await self.message.edit_text(progress_text.strip())
+            await self.message.edit_text(progress_text)
+        except FloodWait as e:
+            # Longer than the client's sleep_threshold: hold off the next edits
+            logger.warning(f"Progress edits flood-limited for {e.value}s")
+            self.last_update = time.monotonic() + e.value
         except Exception:
             pass  # Ignore edit errors
 
 # Bot command handlers
-@app.on_message(filters.command("start"))
 async def start_command(client, message: Message):
     welcome_text = """
 🎬 **Dailymotion Video Uploader Bot**
@@ -256,7 +1043,6 @@ This bot uploads videos from Telegram to Dailymotion using Partner API.
     """
     await message.reply_text(welcome_text)
 
-@app.on_message(filters.command("help"))
 async def help_command(client, message: Message):
     help_text = """
 📖 **How to use this bot:**
@@ -280,7 +1066,6 @@ Send `/upload` then send your video file
     """
     await message.reply_text(help_text)
 
-@app.on_message(filters.command("credentials"))
 async def credentials_command(client, message: Message):
     await message.reply_text(
         "🔐 **Set Dailymotion Credentials**\n\n"
@@ -299,13 +1084,12 @@ async def credentials_command(client, message: Message):
         "Password: mypassword123\n"
         "```"
     )
-    user_credentials[message.from_user.id] = {'waiting_for': 'credentials'}
+    await credential_store.set(message.from_user.id, UserState(waiting_for='credentials'))
 
-@app.on_message(filters.command("upload"))
 async def upload_command(client, message: Message):
     user_id = message.from_user.id
 
-    if user_id not in user_credentials or 'api_key' not in user_credentials[user_id]:
+    if (await credential_store.get(user_id)).api_key is None:
         await message.reply_text(
             "❌ **No credentials set!**\n\n"
             "Please set your Dailymotion credentials first using `/credentials`"
@@ -318,29 +1102,30 @@ async def upload_command(client, message: Message):
         "**Supported:** MP4, AVI, MOV, MKV, WMV\n"
         "**Max size:** 4GB"
     )
-    user_credentials[user_id]['waiting_for'] = 'video'
+    await credential_store.update(user_id, waiting_for='video')
+
+async def _is_plain_text(_, __, message: Message):
+    # Coroutine filters run inline; plain functions would go through the executor
+    return not message.text.startswith('/')
+
+# filters.command([]) never matches, so negating it let commands through
+plain_text = filters.create(_is_plain_text)
 
-@app.on_message(filters.text & ~filters.command([]))
 async def handle_credentials(client, message: Message):
     user_id = message.from_user.id
 
-    if user_id in user_credentials and user_credentials[user_id].get('waiting_for') == 'credentials':
+    state = await credential_store.get(user_id)
+    if state.waiting_for == 'credentials':
         await process_credentials(message)
 
 async def process_credentials(message: Message):
     try:
-        lines = message.text.strip().split('\n')
-        credentials = {}
-
-        for line in lines:
-            if ':' in line:
-                key, value = line.split(':', 1)
-                key = key.strip().lower().replace(' ', '_')
-                value = value.strip()
-                credentials[key] = value
+        credentials = {
+            key.lower().translate(CRED_KEY_TRANSLATION): value
+            for key, value in CRED_RE.findall(message.text)
+        }
 
-        required = ['api_key', 'api_secret', 'username', 'password']
-        missing = [field for field in required if field not in credentials]
+        missing = sorted(REQUIRED_CREDENTIALS - credentials.keys())
 
         if missing:
             await message.reply_text(f"❌ Missing: {', '.join(missing)}")
@@ -349,21 +1134,20 @@ async def process_credentials(message: Message):
         # Test credentials
         status_msg = await message.reply_text("🔄 Testing credentials...")
 
-        uploader = DailymotionUploader(
-            credentials['api_key'],
-            credentials['api_secret'],
-            credentials['username'],
-            credentials['password']
+        state = UserState(
+            api_key=credentials['api_key'],
+            api_secret=credentials['api_secret'],
+            username=credentials['username'],
+            password=credentials['password']
         )
+        # Uploads already queued keep their actor until these credentials check out
+        uploader = DailymotionUploader(state.api_key, state.api_secret, state.username, state.password)
 
         if await uploader.authenticate():
-            user_credentials[message.from_user.id] = {
-                'api_key': credentials['api_key'],
-                'api_secret': credentials['api_secret'],
-                'username': credentials['username'],
-                'password': credentials['password'],
-                'waiting_for': None
-            }
+            if uploader.password is None:
+                state.password = None
+            await credential_store.set(message.from_user.id, state)
+            install_uploader_actor(message.from_user.id, uploader)
             await status_msg.edit_text(
                 "✅ **Credentials saved successfully!**\n\n"
                 "You can now upload videos using `/upload`"
@@ -378,16 +1162,175 @@ async def process_credentials(message: Message):
         logger.error(f"Credentials processing error: {e}")
         await message.reply_text("❌ Error processing credentials. Please try again.")
 
-@app.on_message(filters.video)
+async def _produce_chunks(message: Message, queue: asyncio.Queue):
+    """Feed Telegram download chunks into the queue, ending with None or the error"""
+    try:
+        async for chunk in app.stream_media(message):
+            await queue.put(chunk)
+    except Exception as e:
+        await queue.put(e)
+    else:
+        await queue.put(None)
+
+async def _drain_chunks(queue: asyncio.Queue):
+    """Yield chunks from the queue until the producer signals the end"""
+    while True:
+        chunk = await queue.get()
+        if chunk is None:
+            return
+        if isinstance(chunk, Exception):
+            raise chunk
+        yield chunk
+
+async def stream_video(message: Message, uploader, progress_msg, title, description):
+    """Upload while downloading: Telegram chunks go straight into the POST body"""
+    video = message.video
+    queue = asyncio.Queue(maxsize=STREAM_QUEUE_SIZE)
+    producer = asyncio.create_task(_produce_chunks(message, queue))
+    upload_progress = ProgressTracker(progress_msg, video.file_size, "Streaming to Dailymotion")
+
+    try:
+        return await uploader.upload_video(
+            _drain_chunks(queue),
+            title,
+            description,
+            progress_callback=upload_progress.record,
+            file_size=video.file_size,
+            filename=video.file_name or "video.mp4"
+        )
+    finally:
+        await upload_progress.close()
+        producer.cancel()
+        try:
+            await producer
+        except asyncio.CancelledError:
+            pass
+
+def _create_temp_file(size):
+    """Create the fallback temp file with its full size reserved up front
+
+    One contiguous allocation instead of growing extent by extent, and a
+    full disk fails here rather than minutes into the download.
+    """
+    fd, path = tempfile.mkstemp(suffix='.mp4')
+    try:
+        if size and hasattr(os, 'posix_fallocate'):
+            os.posix_fallocate(fd, 0, size)
+    except OSError:
+        os.close(fd)
+        os.unlink(path)
+        raise
+    os.close(fd)
+    return path
+
+async def download_to_file(message: Message, path, progress_callback=None):
+    """Download the video to disk over parallel Telegram connections
+
+    The file is split into up to DOWNLOAD_CONCURRENCY contiguous chunk
+    ranges. Pyrogram opens a separate media session for every stream_media()
+    call, so each range downloads on its own connection and is written in
+    place with os.pwritev(), every STREAM_QUEUE_SIZE chunks off the loop.
+    """
+    total = message.video.file_size
+    chunk_count = -(-total // STREAM_CHUNK_SIZE)
+    per_segment = max(DOWNLOAD_MIN_SEGMENT, -(-chunk_count // DOWNLOAD_CONCURRENCY))
+    current = 0
+
+    async def fetch(first, count):
+        offset = first * STREAM_CHUNK_SIZE
+        batch = []
+        async for chunk in app.stream_media(message, offset=first, limit=count):
+            batch.append(chunk)
+            if len(batch) == STREAM_QUEUE_SIZE:
+                offset = await write(batch, offset)
+                batch = []
+        if batch:
+            await write(batch, offset)
+
+    async def write(batch, offset):
+        nonlocal current
+        size = sum(map(len, batch))
+        await asyncio.to_thread(os.pwritev, fd, batch, offset)
+        current += size
+        if progress_callback:
+            progress_callback(current, total)
+        return offset + size
+
+    # The file is already preallocated, so O_WRONLY without O_TRUNC keeps its blocks
+    fd = await asyncio.to_thread(os.open, path, os.O_WRONLY)
+    try:
+        tasks = [
+            asyncio.create_task(fetch(first, min(per_segment, chunk_count - first)))
+            for first in range(0, chunk_count, per_segment)
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+    finally:
+        os.close(fd)
+
+    if current != total:
+        raise ConnectionError(f"Download incomplete: {current}/{total} bytes")
+
+async def upload_via_temp_file(message: Message, uploader, progress_msg, title, description):
+    """Fallback path: download to disk first so the upload can be retried"""
+    video = message.video
+
+    temp_path = await asyncio.to_thread(_create_temp_file, video.file_size)
+    # Token and upload URL round-trips overlap with the download
+    prepare = asyncio.create_task(uploader.prepare_upload())
+
+    try:
+        await progress_msg.edit_text("📥 **Downloading from Telegram...**")
+        progress_tracker = ProgressTracker(progress_msg, video.file_size, "Downloading")
+        try:
+            await download_to_file(message, temp_path, progress_tracker.record)
+        finally:
+            await progress_tracker.close()
+
+        upload_url = await prepare
+        await progress_msg.edit_text("🔄 **Starting Dailymotion upload...**")
+        upload_progress = ProgressTracker(progress_msg, video.file_size, "Uploading to Dailymotion")
+        try:
+            return await uploader.upload_video(
+                temp_path,
+                title,
+                description,
+                progress_callback=upload_progress.record,
+                filename=video.file_name,
+                upload_url=upload_url
+            )
+        finally:
+            await upload_progress.close()
+
+    finally:
+        prepare.cancel()
+        try:
+            await aiofiles.os.remove(temp_path)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Could not delete temp file: {e}")
+
 async def handle_video(client, message: Message):
     user_id = message.from_user.id
 
-    if (user_id not in user_credentials or
-        user_credentials[user_id].get('waiting_for') != 'video' or
-        'api_key' not in user_credentials[user_id]):
+    creds = await credential_store.get(user_id)
+    if creds.waiting_for != 'video' or creds.api_key is None:
         await message.reply_text("Please use `/upload` command first.")
         return
 
+    actor = get_uploader_actor(user_id, creds)
+    if actor is None:
+        await message.reply_text(
+            "❌ **Session expired!**\n\n"
+            "Please set your Dailymotion credentials again using `/credentials`"
+        )
+        return
+
     try:
         video = message.video
         file_size_mb = video.file_size / (1024 * 1024)
@@ -403,74 +1346,79 @@ async def handle_video(client, message: Message):
             f"🔄 Starting upload process..."
         )
 
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.mp4') as temp_file:
-            temp_path = temp_file.name
+        progress_msg = await message.reply_text("🔄 **Starting Dailymotion upload...**")
 
-        try:
-            progress_msg = await message.reply_text("📥 **Downloading from Telegram...**")
-            progress_tracker = ProgressTracker(progress_msg, video.file_size, "Downloading")
+        video_title = video.file_name or f"Video_{int(time.time())}"
+        video_description = f"Uploaded via Telegram Bot on {time.strftime('%Y-%m-%d %H:%M:%S')}"
 
-            await app.download_media(
-                message.video.file_id,
-                temp_path,
-                progress=lambda current, total: asyncio.create_task(progress_tracker.update(current, total))
-            )
+    except Exception as e:
+        logger.error(f"Video upload error: {e}")
+        await credential_store.update(user_id, waiting_for=None)
+        await message.reply_text(
+            "❌ **Error during upload!**\n\n"
+            "An unexpected error occurred. Please try again."
+        )
+        return
 
-            await progress_msg.edit_text("🔄 **Starting Dailymotion upload...**")
+    # The upload outlives this handler so it doesn't tie up a dispatcher worker
+    task = asyncio.create_task(report_upload(message, actor, progress_msg, video_title, video_description))
+    upload_tasks.add(task)
+    task.add_done_callback(upload_tasks.discard)
 
-            creds = user_credentials[user_id]
-            uploader = DailymotionUploader(
-                creds['api_key'],
-                creds['api_secret'],
-                creds['username'],
-                creds['password']
-            )
+# Running report_upload() tasks, referenced until they finish
+upload_tasks = set()
 
-            upload_progress = ProgressTracker(progress_msg, video.file_size, "Uploading to Dailymotion")
+async def report_upload(message: Message, actor, progress_msg, video_title, video_description):
+    """Wait for the actor to finish the upload and report the outcome"""
+    async with credential_store.in_use(message.from_user.id):
+        await _report_upload(message, actor, progress_msg, video_title, video_description)
 
-            video_title = video.file_name or f"Video_{int(time.time())}"
-            video_description = f"Uploaded via Telegram Bot on {time.strftime('%Y-%m-%d %H:%M:%S')}"
+async def _report_upload(message: Message, actor, progress_msg, video_title, video_description):
+    try:
+        result = await actor.submit(message, progress_msg, video_title, video_description)
 
-            result = await uploader.upload_video(
-                temp_path,
-                video_title,
-                video_description,
-                progress_callback=lambda current, total: asyncio.create_task(upload_progress.update(current, total))
+        if result == "SIZE_ERROR":
+            await progress_msg.edit_text(
+                "❌ **File size limit exceeded!**\n\n"
+                "The video is too large for Dailymotion's limits. "
+                "Try compressing the video or use a smaller file."
+            )
+        elif result == "AUTH_ERROR":
+            await progress_msg.edit_text(
+                "❌ **Dailymotion login expired!**\n\n"
+                "Your saved credentials were rejected. "
+                "Please set them again using `/credentials`"
+            )
+        elif result == "REJECTED":
+            await progress_msg.edit_text(
+                "❌ **Upload rejected by Dailymotion!**\n\n"
+                "Dailymotion refused this video. Check that the file is a valid "
+                "video and that your account is allowed to upload it."
+            )
+        elif result == "CREATE_ERROR":
+            await progress_msg.edit_text(
+                "⚠️ **Video not confirmed!**\n\n"
+                "The file was uploaded but Dailymotion did not confirm the video. "
+                "Check your Dailymotion account before sending it again."
+            )
+        elif result:
+            video_url = actor.uploader.get_video_url(result)
+            await progress_msg.edit_text(
+                f"🎉 **Upload successful!**\n\n"
+                f"🎬 **Video ID:** `{result}`\n"
+                f"📁 **Title:** {video_title}\n"
+                f"🔗 **URL:** {video_url}\n\n"
+                f"✅ Your video is now live on Dailymotion!"
+            )
+        else:
+            await progress_msg.edit_text(
+                "❌ **Upload failed!**\n\n"
+                "The upload couldn't be completed. This might be due to:\n"
+                "• Network issues\n"
+                "• Dailymotion API limits\n"
+                "• File format issues\n\n"
+                "Please try again later."
             )
-
-            if result == "SIZE_ERROR":
-                await progress_msg.edit_text(
-                    "❌ **File size limit exceeded!**\n\n"
-                    "The video is too large for Dailymotion's limits. "
-                    "Try compressing the video or use a smaller file."
-                )
-            elif result:
-                video_url = uploader.get_video_url(result)
-                await progress_msg.edit_text(
-                    f"🎉 **Upload successful!**\n\n"
-                    f"🎬 **Video ID:** `{result}`\n"
-                    f"📁 **Title:** {video_title}\n"
-                    f"🔗 **URL:** {video_url}\n\n"
-                    f"✅ Your video is now live on Dailymotion!"
-                )
-            else:
-                await progress_msg.edit_text(
-                    "❌ **Upload failed!**\n\n"
-                    "The upload couldn't be completed. This might be due to:\n"
-                    "• Network issues\n"
-                    "• Dailymotion API limits\n"
-                    "• File format issues\n\n"
-                    "Please try again later."
-                )
-
-        finally:
-            if os.path.exists(temp_path):
-                try:
-                    os.unlink(temp_path)
-                except Exception as e:
-                    logger.warning(f"Could not delete temp file: {e}")
-
-            user_credentials[user_id]['waiting_for'] = None
 
     except Exception as e:
         logger.error(f"Video upload error: {e}")
@@ -479,13 +1427,18 @@ async def handle_video(client, message: Message):
             "An unexpected error occurred. Please try again."
         )
 
+    finally:
+        await credential_store.update(message.from_user.id, waiting_for=None)
+
 # Health check server for Render
+HEALTH_BODY = orjson.dumps({"status": "healthy", "service": "dailymotion-bot"})
+
 async def start_health_server():
     """Start health check server for Render"""
     from aiohttp import web
 
     async def health_check(request):
-        return web.json_response({"status": "healthy", "service": "dailymotion-bot"})
+        return web.Response(body=HEALTH_BODY, content_type='application/json')
 
     try:
         health_app = web.Application()
@@ -502,57 +1455,59 @@ async def start_health_server():
         return None
 
 # Graceful shutdown handler
+shutdown_event = asyncio.Event()
+
 def setup_signal_handlers(loop):
     """Setup signal handlers for graceful shutdown"""
     import signal
 
     def signal_handler():
         logger.info("Received shutdown signal, initiating graceful shutdown...")
-        for task in asyncio.all_tasks(loop):
-            task.cancel()
+        shutdown_event.set()
 
     if hasattr(signal, 'SIGTERM'):
         loop.add_signal_handler(signal.SIGTERM, signal_handler)
     if hasattr(signal, 'SIGINT'):
         loop.add_signal_handler(signal.SIGINT, signal_handler)
 
-# Main function for Render deployment
-async def main():
-    """Main function to run bot and health server"""
-    health_runner = None
+async def run_health_server():
+    """Serve the health check until shutdown"""
+    health_runner = await start_health_server()
+    if not health_runner:
+        logger.warning("Health server failed to start, continuing without it")
+        return
 
     try:
-        # Get event loop for signal handling
-        loop = asyncio.get_event_loop()
-
-        # Setup signal handlers (only on Unix systems)
-        try:
-            setup_signal_handlers(loop)
-        except Exception as e:
-            logger.warning(f"Could not setup signal handlers: {e}")
-
-        # Start health check server
-        health_runner = await start_health_server()
-
-        if not health_runner:
-            logger.warning("Health server failed to start, continuing without it")
-
-        # Start the bot
-        logger.info("🚀 Starting Dailymotion Upload Bot...")
-        await app.start()  # Use bot token directly
-        logger.info("✅ Bot started successfully!")
+        await shutdown_event.wait()
+    finally:
+        logger.info("Stopping health server...")
+        await health_runner.cleanup()
+        logger.info("Health server stopped")
+
+# Message handlers, registered by run_bot() on the running loop
+MESSAGE_HANDLERS = (
+    (start_command, filters.command("start")),
+    (help_command, filters.command("help")),
+    (credentials_command, filters.command("credentials")),
+    (upload_command, filters.command("upload")),
+    (handle_credentials, filters.text & plain_text),
+    (handle_video, filters.video),
+)
 
-        # Keep running until interrupted
-        await app.idle()
+async def run_bot():
+    """Run the Pyrogram client until shutdown"""
+    logger.info("🚀 Starting Dailymotion Upload Bot...")
+    # The client was built at import time, before asyncio.run() made this loop.
+    # Dispatcher.add_handler() schedules its work on dispatcher.loop, so
+    # handlers can only be added once it points at the running loop.
+    app.loop = app.dispatcher.loop = asyncio.get_running_loop()
+    for callback, handler_filter in MESSAGE_HANDLERS:
+        app.add_handler(MessageHandler(callback, handler_filter))
+    await app.start()  # Use bot token directly
+    logger.info("✅ Bot started successfully!")
 
-    except asyncio.CancelledError:
-        logger.info("Tasks cancelled, shutting down...")
-    except KeyboardInterrupt:
-        logger.info("Received keyboard interrupt, shutting down...")
-    except Exception as e:
-        logger.error(f"Startup error: {e}")
-        import traceback
-        traceback.print_exc()
+    try:
+        await shutdown_event.wait()
     finally:
         logger.info("Starting cleanup process...")
         try:
@@ -562,17 +1517,44 @@ async def main():
                 logger.info("Pyrogram client stopped")
         except Exception as e:
             logger.error(f"Error stopping bot: {e}")
-        if health_runner:
-            try:
-                logger.info("Stopping health server...")
-                await health_runner.cleanup()
-                logger.info("Health server stopped")
-            except Exception as e:
-                logger.error(f"Error stopping health server: {e}")
-        logger.info("Shutdown complete")
+        try:
+            await close_uploader_actors()
+            await close_http_session()
+        except Exception as e:
+            logger.error(f"Error closing HTTP sessions: {e}")
+
+# Main function for Render deployment
+async def main():
+    """Main function to run bot and health server
+
+    Both run in one TaskGroup: a shutdown signal ends them together, and a
+    crash in either cancels the other instead of leaving a half-alive process.
+    """
+    loop = asyncio.get_running_loop()
+
+    # Setup signal handlers (only on Unix systems)
+    try:
+        setup_signal_handlers(loop)
+    except Exception as e:
+        logger.warning(f"Could not setup signal handlers: {e}")
+
+    try:
+        async with asyncio.TaskGroup() as tg:
+            tg.create_task(run_health_server())
+            tg.create_task(run_bot())
+    except* Exception as eg:
+        for e in eg.exceptions:
+            logger.error(f"Startup error: {e}", exc_info=e)
+    logger.info("Shutdown complete")
 
 # Run the bot
 if __name__ == "__main__":
+    try:
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    except ImportError:
+        logger.info("uvloop not installed, using the default event loop")
+
     try:
         asyncio.run(main())
     except KeyboardInterrupt: